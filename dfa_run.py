@@ -0,0 +1,308 @@
+"""
+Integer-indexed transition tables for running automata from the command line
+tools. If numba is installed, the DFA table walk is JIT-compiled.
+
+numba and numpy are imported by the first :func:`compile_dfa` call rather than
+with this module, so tools that exit before running any input, e.g. on
+``--help`` or an argument error, don't pay for them.
+"""
+
+from collections import deque
+
+from python_fsa import NFA
+
+# Set by _load_jit, while None the table walks run as plain Python
+np = None
+_jit_loaded = False
+
+__all__ = ["CompiledDFA", "CompiledNFA", "compile_automaton", "compile_dfa", "compile_nfa", "run", "trace"]
+
+
+class _Compiled:
+    # What CompiledDFA and CompiledNFA share, both map symbols through sym_ix
+
+    def accepts(self, input):
+        """
+        Returns True if the given input is accepted by the compiled automaton
+        and False otherwise
+        """
+        sym_ix = self.sym_ix
+        syms = [sym_ix.get(e, -1) for e in input]
+        if -1 in syms:
+            return False
+        return self.accepts_indices(syms)
+
+
+class CompiledDFA(_Compiled):
+    """
+    A DFA with its states and symbols encoded as integers.
+
+    Transitions are stored in a flat table indexed by
+    ``state * n_symbols + symbol``, with -1 marking a missing transition.
+    As with :class:`python_fsa.DFA`, a missing transition or a symbol outside
+    the alphabet rejects the input.
+    """
+
+    def __init__(self, *, state_ix, sym_ix, table, initial, final_mask):
+        self.state_ix = state_ix
+        self.sym_ix = sym_ix
+        self.n_symbols = len(sym_ix)
+        self.table = table
+        self.initial = initial
+        self.final_mask = final_mask
+        self._names = [*state_ix]
+
+    def accepts_indices(self, syms):
+        """
+        Like :meth:`accepts`, for input already mapped to symbol indices
+        through ``sym_ix``
+        """
+        if np is not None:
+            syms = np.array(syms, dtype=np.int32)
+        return bool(
+            run(self.table, self.n_symbols, self.final_mask, self.initial, syms)
+        )
+
+    def trace_indices(self, state, syms):
+        """
+        Returns the states visited walking from the given state index over
+        symbol indices, starting with ``state``. After a missing transition
+        every further state is -1.
+        """
+        if np is not None:
+            syms = np.array(syms, dtype=np.int32)
+            out = np.empty(len(syms) + 1, dtype=np.int32)
+        else:
+            out = [0] * (len(syms) + 1)
+        trace(self.table, self.n_symbols, state, syms, out)
+        return [int(s) for s in out]
+
+    def is_final(self, state):
+        """Returns True if the given state index is a final state"""
+        return state >= 0 and bool(self.final_mask[state])
+
+    def name_of(self, state):
+        """Returns the name of the given state index, None for -1"""
+        return self._names[state] if state >= 0 else None
+
+
+class CompiledNFA(_Compiled):
+    """
+    An NFA with its states and symbols encoded as integers, run on sets of
+    state indices without determinizing it first.
+
+    Transitions are stored in a flat list indexed by
+    ``state * n_symbols + symbol``, holding the frozenset of next states with
+    epsilon closures applied as :class:`python_fsa.NFA` applies them. The
+    ``initial`` and ``final`` state sets are closed the same way.
+    """
+
+    def __init__(self, *, state_ix, sym_ix, table, initial, final):
+        self.state_ix = state_ix
+        self.sym_ix = sym_ix
+        self.n_symbols = len(sym_ix)
+        self.table = table
+        self.initial = initial
+        self.final = final
+        self._names = [*state_ix]
+
+    def accepts_indices(self, syms):
+        """
+        Like :meth:`accepts`, for input already mapped to symbol indices
+        through ``sym_ix``
+        """
+        table = self.table
+        n_symbols = self.n_symbols
+        current = self.initial
+        for sym in syms:
+            current = _EMPTY.union(*[table[s * n_symbols + sym] for s in current])
+            if not current:
+                return False
+        return not current.isdisjoint(self.final)
+
+    def trace_indices(self, state, syms):
+        """
+        Returns the state sets visited walking from the given set of state
+        indices over symbol indices, starting with ``state``
+        """
+        table = self.table
+        n_symbols = self.n_symbols
+        visited = [state]
+        for sym in syms:
+            state = _EMPTY.union(*[table[s * n_symbols + sym] for s in state])
+            visited.append(state)
+        return visited
+
+    def is_final(self, state):
+        """Returns True if the given state set contains a final state"""
+        return not state.isdisjoint(self.final)
+
+    def name_of(self, state):
+        """Returns the names of the states in the given state set"""
+        names = self._names
+        return frozenset(names[s] for s in state)
+
+
+_EMPTY = frozenset()
+
+
+def compile_automaton(automaton):
+    """
+    Compiles a DFA into a :class:`CompiledDFA` and an NFA into a
+    :class:`CompiledNFA`, leaving it nondeterministic.
+    """
+    if isinstance(automaton, NFA):
+        return compile_nfa(automaton)
+    return compile_dfa(automaton)
+
+
+def compile_nfa(nfa):
+    """Compiles an NFA into a :class:`CompiledNFA`"""
+    transitions = nfa.transitions
+    epsilon = nfa.epsilon
+
+    # Number every state, including any only named by a transition, and the
+    # symbols of the alphabet. sym_ix is what inputs are validated against, so
+    # transitions on any other symbol are left out.
+    state_ix = {s: i for i, s in enumerate(nfa.states)}
+    sym_ix = {a: i for i, a in enumerate(nfa.alphabet)}
+    state_ix.setdefault(nfa.initial, len(state_ix))
+    for (state, symbol), next_states in transitions.items():
+        state_ix.setdefault(state, len(state_ix))
+        for next_state in next_states:
+            state_ix.setdefault(next_state, len(state_ix))
+
+    n_states = len(state_ix)
+    epsilon_moves = [[] for _ in range(n_states)]
+    moves = [[] for _ in range(n_states)]
+    for (state, symbol), next_states in transitions.items():
+        targets = [state_ix[s] for s in next_states]
+        if symbol == epsilon:
+            epsilon_moves[state_ix[state]].extend(targets)
+        elif symbol in sym_ix:
+            moves[state_ix[state]].append((sym_ix[symbol], targets))
+    closures = [_closure(i, epsilon_moves) for i in range(n_states)]
+
+    # A state moves on a symbol wherever any state of its closure does
+    n_symbols = len(sym_ix)
+    table = [_EMPTY] * (n_states * n_symbols)
+    for i, closure in enumerate(closures):
+        next_states = {}
+        for q in closure:
+            for sym, targets in moves[q]:
+                next_states.setdefault(sym, set()).update(targets)
+        for sym, targets in next_states.items():
+            table[i * n_symbols + sym] = frozenset(targets)
+
+    final = _EMPTY.union(*(closures[state_ix[s]] for s in nfa.final if s in state_ix))
+    return CompiledNFA(
+        state_ix=state_ix,
+        sym_ix=sym_ix,
+        table=table,
+        initial=closures[state_ix[nfa.initial]],
+        final=final,
+    )
+
+
+def _closure(state, epsilon_moves):
+    # The states reachable from state through epsilon moves, itself included
+    closure = {state}
+    queue = deque(closure)
+    while queue:
+        for next_state in epsilon_moves[queue.pop()]:
+            if next_state not in closure:
+                closure.add(next_state)
+                queue.append(next_state)
+    return frozenset(closure)
+
+
+def compile_dfa(automaton):
+    """
+    Compiles a DFA, or an NFA by way of its subset construction, into a
+    :class:`CompiledDFA`. The subset construction can take time and memory
+    exponential in the number of NFA states, :func:`compile_automaton` runs
+    an NFA as is instead.
+    """
+    _load_jit()
+    if isinstance(automaton, NFA):
+        automaton = automaton.to_dfa()
+    transitions = automaton.transitions
+
+    # Number every state, including any only named by a transition, and the
+    # symbols of the alphabet. sym_ix is what inputs are validated against, so
+    # transitions on any other symbol are left out.
+    state_ix = {s: i for i, s in enumerate(automaton.states)}
+    sym_ix = {a: i for i, a in enumerate(automaton.alphabet)}
+    state_ix.setdefault(automaton.initial, len(state_ix))
+    for (state, symbol), next_state in transitions.items():
+        state_ix.setdefault(state, len(state_ix))
+        state_ix.setdefault(next_state, len(state_ix))
+
+    n_symbols = len(sym_ix)
+    table = [-1] * (len(state_ix) * n_symbols)
+    for (state, symbol), next_state in transitions.items():
+        if symbol in sym_ix:
+            table[state_ix[state] * n_symbols + sym_ix[symbol]] = state_ix[next_state]
+
+    final_mask = [False] * len(state_ix)
+    for state in automaton.final:
+        if state in state_ix:
+            final_mask[state_ix[state]] = True
+
+    initial = state_ix[automaton.initial]
+    if np is not None:
+        table = np.array(table, dtype=np.int32)
+        final_mask = np.array(final_mask, dtype=np.bool_)
+
+    return CompiledDFA(
+        state_ix=state_ix,
+        sym_ix=sym_ix,
+        table=table,
+        initial=initial,
+        final_mask=final_mask,
+    )
+
+
+def run(table, n_symbols, final_mask, initial, syms):
+    """
+    Walks the transition table from the initial state over the given symbol
+    indices and returns whether it ends in a final state.
+    """
+    state = initial
+    for sym in syms:
+        state = table[state * n_symbols + sym]
+        if state < 0:
+            return False
+    return final_mask[state]
+
+
+def trace(table, n_symbols, state, syms, out):
+    """
+    Walks the transition table from the given state over the given symbol
+    indices, writing each state visited to ``out``, which has room for
+    ``len(syms) + 1`` states.
+    """
+    out[0] = state
+    for i in range(len(syms)):
+        if state >= 0:
+            state = table[state * n_symbols + syms[i]]
+        out[i + 1] = state
+
+
+def _load_jit():
+    # Import numba and replace run and trace with their compiled versions, once.
+    # With explicit signatures numba compiles eagerly, loading from the on-disk
+    # cache after the first run, instead of at the first call for each new set
+    # of argument types. Callers pass int32 arrays and plain ints.
+    global np, run, trace, _jit_loaded
+    if _jit_loaded:
+        return
+    _jit_loaded = True
+    try:
+        import numpy
+        from numba import njit
+    except ImportError:
+        return
+    run = njit("boolean(int32[::1], int64, boolean[::1], int64, int32[::1])", cache=True)(run)
+    trace = njit("void(int32[::1], int64, int64, int32[::1], int32[::1])", cache=True)(trace)
+    np = numpy
@@ -1,58 +1,81 @@
 import argparse
-import graphviz
+import hashlib
+import io
 import sys
-import re
+from dot_lex import lex_dot
+from fsa_viz import is_up_to_date, render_batch, write_stamp
 
-def customize_dot_file(input_dot_path, output_dot_path, output_png_path=None):
+def _input_digest(input_dot_path, outputs):
+    # Hash of the input file and the requested outputs, read in chunks
+    digest = hashlib.blake2b(digest_size=16)
+    with open(input_dot_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    digest.update('\0'.join(outputs).encode())
+    return digest.hexdigest()
+
+def _highlight_initial(input_dot_path, output_path):
+    # Copy the source as is, adding a statement that styles the initial state red
+    # before the closing brace. Returns the initial state, or None if there isn't one.
+    with open(input_dot_path, 'r') as f:
+        source = f.read()
+    initial_state = next((value for kind, value in lex_dot(io.StringIO(source)) if kind == 'initial'), None)
+    if initial_state:
+        end = source.rindex('}')
+        source = f"{source[:end]}\t{initial_state} [color=red style=filled]\n{source[end:]}"
+    with open(output_path, 'w') as f:
+        f.write(source)
+    return initial_state
+
+def customize_dot_file(input_dot_path, output_dot_path, output_png_path=None, force=False):
     try:
-        with open(input_dot_path, 'r') as f:
-            dot_source = f.read()
+        # Skip parsing and rendering if the outputs were made from this same input
+        outputs = [f"{output_dot_path}.dot"]
+        if output_png_path:
+            outputs.append(f"{output_png_path}.png")
+        stamp_path = f"{output_dot_path}.hash"
+        digest = _input_digest(input_dot_path, outputs)
+        if not force and is_up_to_date(stamp_path, digest, outputs):
+            for output in outputs:
+                print(f"{output} is up to date, skipping.")
+            return
 
-        # Initialize a new Digraph
-        graph = graphviz.Digraph(comment='Customized Graph')
-        
-        # Regex to find graph attributes (like rankdir)
-        graph_attr_match = re.search(r'digraph\s*{\s*([^}]+)}', dot_source, re.DOTALL)
-        if graph_attr_match:
-            attrs_str = graph_attr_match.group(1)
-            # Simple parsing for rankdir, can be extended for others
-            rankdir_match = re.search(r'rankdir\s*=\s*([a-zA-Z]+)', attrs_str)
-            if rankdir_match:
-                graph.attr(rankdir=rankdir_match.group(1))
+        if output_png_path is None:
+            # Nothing has to be laid out without a PNG, so the source is copied with
+            # the initial state restyled instead of being rebuilt as a graph
+            initial_state = _highlight_initial(input_dot_path, f"{output_dot_path}.dot")
+            if initial_state:
+                print(f"Customized initial state '{initial_state}' to be red.")
+            else:
+                print("Could not identify initial state for customization.")
+            write_stamp(stamp_path, digest)
+            print(f"Customized DOT saved to {output_dot_path}.dot")
+            return
 
-        # Regex to find node definitions and attributes
-        # This is a simplified regex and might not catch all cases
-        node_pattern = re.compile(r'node\s*\[([^\]]+)\];\s*([a-zA-Z0-9_]+(?:;\s*[a-zA-Z0-9_]+)*)')
-        for match in node_pattern.finditer(dot_source):
-            attrs_str = match.group(1)
-            node_names_str = match.group(2)
-            node_names = [n.strip() for n in node_names_str.split(';') if n.strip()]
-            
-            node_attrs = {}
-            # Simple parsing for shape, can be extended
-            shape_match = re.search(r'shape\s*=\s*([a-zA-Z]+)', attrs_str)
-            if shape_match:
-                node_attrs['shape'] = shape_match.group(1)
-            
-            for node_name in node_names:
-                graph.node(node_name, **node_attrs)
+        # Initialize a new Digraph, graphviz is only needed from here on
+        import graphviz
+        graph = graphviz.Digraph(comment='Customized Graph')
 
-        # Regex to find initial state (null -> State) and other nodes
+        # Rebuild the graph while streaming the source line by line
         initial_state = None
-        initial_match = re.search(r'null\s*->\s*([a-zA-Z0-9_]+)', dot_source)
-        if initial_match:
-            initial_state = initial_match.group(1)
-            graph.node('', shape='none', width='0', height='0') # Re-add invisible null node
-            graph.edge('', initial_state) # Re-add initial state edge
-
-        # Regex to find edges (transitions)
-        # This is a simplified regex and might not catch all cases
-        edge_pattern = re.compile(r'([a-zA-Z0-9_]+)\s*->\s*([a-zA-Z0-9_]+)\s*\[label\s*=\s*"([^"]+)"\]')
-        for match in edge_pattern.finditer(dot_source):
-            from_node = match.group(1)
-            to_node = match.group(2)
-            label = match.group(3)
-            graph.edge(from_node, to_node, label=label)
+        with open(input_dot_path, 'r') as f:
+            for kind, value in lex_dot(f):
+                if kind == 'graph_attr':
+                    key, attr_value = value
+                    graph.attr(**{key: attr_value})
+                elif kind == 'defaults':
+                    target, default_attrs = value
+                    graph.attr(target, **default_attrs)
+                elif kind == 'node_decl':
+                    node_name, node_attrs = value
+                    graph.node(node_name, **node_attrs)
+                elif kind == 'edge':
+                    from_node, to_node, edge_attrs = value
+                    graph.edge(from_node, to_node, **edge_attrs)
+                elif kind == 'initial':
+                    initial_state = value
+                    graph.node('', shape='none', width='0', height='0') # Re-add invisible null node
+                    graph.edge('', initial_state) # Re-add initial state edge
 
         # --- Customization Logic ---
         if initial_state:
@@ -61,14 +84,12 @@ def customize_dot_file(input_dot_path, output_dot_path, output_png_path=None):
         else:
             print("Could not identify initial state for customization.")
 
-        # Save the modified DOT file
-        graph.render(output_dot_path, view=False, format='dot', cleanup=True)
+        # The DOT source is written directly, dot is only started for the PNG
+        graph.save(f"{output_dot_path}.dot")
+        render_batch([(graph, output_png_path)])
+        write_stamp(stamp_path, digest)
         print(f"Customized DOT saved to {output_dot_path}.dot")
-
-        # Render to PNG if requested
-        if output_png_path:
-            graph.render(output_png_path, view=False, format='png', cleanup=True)
-            print(f"Customized PNG saved to {output_png_path}.png")
+        print(f"Customized PNG saved to {output_png_path}.png")
 
     except FileNotFoundError:
         print(f"Error: Input DOT file not found at {input_dot_path}", file=sys.stderr)
@@ -82,10 +103,11 @@ if __name__ == "__main__":
     parser.add_argument('--input', required=True, help="Path to the input DOT file.")
     parser.add_argument('--output', required=True, help="Base name for the output DOT and PNG files (e.g., 'custom_dfa').")
     parser.add_argument('--no-png', action='store_true', help="Do not generate a PNG image.")
+    parser.add_argument('--force', action='store_true', help="Regenerate the outputs even if the input hasn't changed since they were made.")
 
     args = parser.parse_args()
 
     output_dot_base = args.output
     output_png_base = args.output if not args.no_png else None
 
-    customize_dot_file(args.input, output_dot_base, output_png_base)
\ No newline at end of file
+    customize_dot_file(args.input, output_dot_base, output_png_base, force=args.force)
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+A small streaming lexer for the DOT files the command line tools read and
+write, such as the ones in ``assets/dot_files``.
+"""
+
+import re
+
+__all__ = ["lex_dot"]
+
+# One alternation over the tokens that matter for splitting DOT into statements,
+# _statements dispatches on the name of the group that matched. Anything else is
+# skipped over by finditer itself.
+_TOKEN_RE = re.compile(r'''
+    (?P<quoted>"[^"\\]*(?:\\.[^"\\]*)*")                         # a complete quoted string
+  | (?P<attrs>\[[^\]"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^\]"]*)*\])   # a complete attribute list
+  | (?P<comment>//[^\n]*|(?m:^)\#[^\n]*|/\*.*?\*/)                # a line or complete block comment
+  | (?P<open>["[]|/\*)                                            # or one still open at the end of the text
+  | (?P<separator>[;\n{}])
+''', re.VERBOSE | re.DOTALL)
+
+# The characters that can close a quoted string or attribute list left open at
+# the end of a line
+_CLOSE_RE = re.compile(r'[\\"\]]')
+
+# Another attribute list following one on the same line, as in `a [x=1] [y=2]`
+_MORE_ATTRS_RE = re.compile(r'[ \t]*\[')
+
+# Matches a single `key = value` pair inside an attribute list. Keys only start
+# at a word boundary and the quoted/bare value classes can't overlap, so a failed
+# match gives up after one pass over the key instead of retrying every suffix.
+_ATTR_RE = re.compile(r'(?<!\w)(\w+)\s*=\s*("(?:[^"\\]|\\[\s\S])*"|[^,;\s"\]]+)')
+
+# Escapes resolved in quoted values: an escaped quote, and a backslash-newline
+# line continuation, which DOT removes
+_QUOTED_ESCAPE_RE = re.compile(r'\\(["\n])')
+
+def _statements(lines):
+    # Yield the statements of the top-level graph body, reading one line at a time.
+    # Each line is scanned once with _TOKEN_RE; quoted strings, attribute lists and
+    # comments match whole, so separators inside them don't end a statement. One
+    # left open is carried over, and following lines are only searched for its end
+    # with _find_close before scanning resumes where it started. Comments are cut
+    # out of statements, and nested subgraphs are dropped along with the rest of
+    # the statement they appear in.
+    depth = 0
+    pending = ''
+    parts = []
+    dropping = False
+    resume = 0
+    open_state = None
+    open_lines = []
+    for line in lines:
+        if open_state is not None:
+            opener, in_quote, skip = open_state
+            end, in_quote, skip = _find_close(line, skip, opener, in_quote)
+            open_lines.append(line)
+            if end < 0:
+                open_state = opener, in_quote, skip
+                continue
+            open_state = None
+            text = pending + ''.join(open_lines)
+            open_lines.clear()
+        else:
+            resume = len(pending)
+            text = pending + line
+        start = 0
+        for match in _TOKEN_RE.finditer(text, resume):
+            kind = match.lastgroup
+            if kind == 'open':
+                opener = match.group()
+                _, in_quote, skip = _find_close(text, match.end(), opener, opener == '"')
+                open_state = opener, in_quote, skip
+                resume = match.start() - start
+                break
+            if kind == 'comment':
+                parts.append(text[start:match.start()])
+                start = match.end()
+            elif kind == 'attrs':
+                # An attribute list ends its statement unless another one follows,
+                # so in `node [shape=circle] a b` the names are a statement of their own
+                if depth == 1 and not _MORE_ATTRS_RE.match(text, match.end()):
+                    if dropping:
+                        dropping = False
+                    else:
+                        parts.append(text[start:match.end()])
+                        yield ' '.join(parts).strip()
+                    parts.clear()
+                    start = match.end()
+            elif kind == 'separator':
+                c = match.group()
+                if depth == 1 and c != '{':
+                    if dropping:
+                        dropping = False
+                    else:
+                        parts.append(text[start:match.start()])
+                        statement = ' '.join(parts).strip()
+                        if statement:
+                            yield statement
+                parts.clear()
+                if c == '{':
+                    depth += 1
+                elif c == '}':
+                    depth -= 1
+                    # Whatever follows a subgraph up to the end of its statement,
+                    # such as attributes of an edge into it, goes with it
+                    dropping = depth == 1
+                start = match.end()
+        pending = text[start:]
+    if open_state is not None:
+        what = {'"': 'quoted string', '[': 'attribute list'}.get(open_state[0], 'comment')
+        raise ValueError(f"Unterminated {what} in DOT input: {pending[resume:].strip()[:40]!r}")
+
+def _find_close(text, pos, opener, in_quote):
+    # Continue a quoted string, attribute list or block comment, named by the
+    # characters that opened it, from pos in text. Returns the end of the closing
+    # characters or -1, whether a quote is still open and how many characters of
+    # the next text an escape skips.
+    if opener == '/*':
+        end = text.find('*/', pos)
+        return (end + 2 if end >= 0 else -1), False, 0
+    in_attrs = opener == '['
+    while True:
+        match = _CLOSE_RE.search(text, pos)
+        if match is None:
+            return -1, in_quote, max(pos - len(text), 0)
+        c = match.group()
+        pos = match.end()
+        if c == '\\':
+            if in_quote:
+                pos += 1
+        elif c == '"':
+            in_quote = not in_quote
+            if not in_quote and not in_attrs:
+                return pos, in_quote, 0
+        elif not in_quote:
+            return pos, in_quote, 0
+
+def _parse_attrs(attrs_str):
+    return {key: _unquote(value) for key, value in _ATTR_RE.findall(attrs_str)}
+
+def _unquote(value):
+    # Drop the one pair of quotes around a quoted value and resolve its escapes,
+    # others such as \n or \l in labels are left for Graphviz
+    if not value.startswith('"'):
+        return value
+    return _QUOTED_ESCAPE_RE.sub(_unescape, value[1:-1])
+
+def _unescape(match):
+    return '"' if match.group(1) == '"' else ''
+
+def lex_dot(lines):
+    """
+    Yields ``(kind, value)`` tokens for the statements of a DOT graph read from
+    an iterable of lines:
+
+    - ``('graph_attr', (key, value))`` for ``key = value``
+    - ``('defaults', (target, attrs))`` for ``graph``/``node``/``edge [...]``
+    - ``('node_decl', (name, attrs))`` for each declared node other than ``null``
+    - ``('edge', (src, dst, attrs))`` for each edge not leaving ``null``, one per
+      pair of an edge chain like ``a -> b -> c``
+    - ``('initial', dst)`` for the ``null -> dst`` edge marking the initial state
+
+    Comments are ignored. Subgraphs, and statements with a subgraph in them
+    such as ``a -> {b c}``, are skipped. A quoted string or attribute
+    list that is never closed raises :class:`ValueError`.
+    """
+    for statement in _statements(lines):
+        bracket = statement.find('[')
+        if bracket >= 0:
+            head = statement[:bracket].strip()
+            attrs = _parse_attrs(statement[bracket + 1:statement.rfind(']')])
+        else:
+            head = statement
+            attrs = {}
+
+        if '->' in head:
+            # An edge chain `a -> b -> c` stands for an edge between each neighbouring pair
+            nodes = [node.strip() for node in head.split('->')]
+            for from_node, to_node in zip(nodes, nodes[1:]):
+                if from_node == 'null':
+                    yield 'initial', to_node
+                else:
+                    yield 'edge', (from_node, to_node, attrs)
+        elif head in ('graph', 'node', 'edge'):
+            yield 'defaults', (head, attrs)
+        elif '=' in head:
+            key, _, value = head.partition('=')
+            yield 'graph_attr', (key.strip(), value.strip().strip('"'))
+        elif head:
+            # Several node IDs may share a statement, the attributes belong to the last
+            *names, last = head.split()
+            for node_name in names:
+                if node_name != 'null':
+                    yield 'node_decl', (node_name, {})
+            # The null node only anchors the arrow into the initial state
+            if last != 'null':
+                yield 'node_decl', (last, attrs)
@@ -0,0 +1,143 @@
+"""
+Saving and loading automata as JSON for the command line tools. If orjson is
+installed it is used for encoding and decoding.
+"""
+
+import json
+import sys
+from itertools import islice
+
+from python_fsa import DFA, NFA
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+__all__ = ["serialize_automaton", "deserialize_automaton", "dump", "dumps", "loads"]
+
+# Number of list items encoded per write by dump()
+_CHUNK_SIZE = 4096
+
+
+def serialize_automaton(automaton):
+    """
+    Converts a DFA or NFA to a JSON-serializable dictionary.
+
+    Transitions are stored as the parallel lists ``t_from``, ``t_sym`` and
+    ``t_to``, where ``t_to`` holds a state for a DFA and a list of states for
+    an NFA.
+    """
+    is_dfa = isinstance(automaton, DFA)
+    transitions = automaton.transitions
+    return {
+        "type": "dfa" if is_dfa else "nfa",
+        "alphabet": list(automaton.alphabet),
+        "states": list(automaton.states),
+        "initial": automaton.initial,
+        "final": list(automaton.final),
+        "t_from": [state for state, _ in transitions],
+        "t_sym": [symbol for _, symbol in transitions],
+        "t_to": list(transitions.values()) if is_dfa else [list(v) for v in transitions.values()],
+    }
+
+
+def deserialize_automaton(data):
+    """
+    Reconstructs a DFA or NFA from a dictionary made by
+    :func:`serialize_automaton`. Files using the older layout, with
+    transitions keyed by ``"state,symbol"``, are read as well.
+
+    String state and symbol names are interned, so every transition shares
+    one string object per name. Other JSON values, such as numbers, are kept
+    as they are.
+    """
+    intern = _intern
+    automaton_type = data["type"]
+    alphabet = tuple(map(intern, data["alphabet"]))
+    states = tuple(map(intern, data["states"]))
+    initial = intern(data["initial"])
+    final = tuple(map(intern, data["final"]))
+
+    if "t_from" in data:
+        keys = zip(map(intern, data["t_from"]), map(intern, data["t_sym"]))
+        targets = data["t_to"]
+    else:
+        keys = map(_split_key, data["transitions"])
+        targets = data["transitions"].values()
+
+    if automaton_type == "dfa":
+        transitions = dict(zip(keys, map(intern, targets)))
+        return DFA(alphabet=alphabet, states=states, initial=initial, final=final, transitions=transitions)
+    else:
+        transitions = {key: tuple(map(intern, value)) for key, value in zip(keys, targets)}
+        return NFA(alphabet=alphabet, states=states, initial=initial, final=final, transitions=transitions)
+
+
+def dump(automaton, f):
+    """
+    Writes a DFA or NFA to a binary file in the layout of
+    :func:`serialize_automaton`, without building the dictionary first.
+
+    The transition lists are encoded and written a chunk at a time, so saving
+    a large automaton holds neither a copy of its transitions nor the whole
+    JSON document in memory.
+    """
+    is_dfa = isinstance(automaton, DFA)
+    transitions = automaton.transitions
+    header = dumps({
+        "type": "dfa" if is_dfa else "nfa",
+        "alphabet": list(automaton.alphabet),
+        "states": list(automaton.states),
+        "initial": automaton.initial,
+        "final": list(automaton.final),
+    })
+    f.write(header[:-1])
+    columns = (
+        (b"t_from", (state for state, _ in transitions)),
+        (b"t_sym", (symbol for _, symbol in transitions)),
+        (b"t_to", transitions.values() if is_dfa else map(list, transitions.values())),
+    )
+    for key, items in columns:
+        f.write(b',"' + key + b'":[')
+        _write_items(f, items)
+        f.write(b']')
+    f.write(b'}')
+
+
+def dumps(data):
+    """Encodes a serialized automaton as compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def loads(data):
+    """
+    Decodes JSON bytes or text. Malformed input raises
+    :class:`json.JSONDecodeError` with either decoder.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_items(f, items):
+    # Write the JSON encoding of each item, comma separated, without brackets
+    items = iter(items)
+    separator = b''
+    while chunk := list(islice(items, _CHUNK_SIZE)):
+        f.write(separator)
+        f.write(dumps(chunk)[1:-1])
+        separator = b','
+
+
+def _intern(value):
+    # sys.intern only takes str, numeric states and symbols load as they are
+    return sys.intern(value) if type(value) is str else value
+
+
+def _split_key(key):
+    # Turn an older "state,symbol" key back into an interned transition key
+    state, symbol = key.split(',')
+    return sys.intern(state), sys.intern(symbol)
@@ -0,0 +1,166 @@
+"""
+Rendering helpers shared by the command line tools.
+
+graphviz, and pygraphviz when installed, are imported by the functions that
+need them, so importing this module doesn't pay for them in runs that never
+render.
+"""
+
+import hashlib
+import os
+import re
+import subprocess
+import sys
+
+__all__ = ["visualize_automaton", "render_batch", "is_up_to_date", "write_stamp", "OUTPUT_FORMATS"]
+
+# Formats the command line tools offer for visualizations
+OUTPUT_FORMATS = ("png", "svg", "pdf")
+
+# Names and numerals DOT accepts without quotes, anything else is quoted
+_PLAIN_ID_RE = re.compile(r'[a-zA-Z_\x80-\uffff][\w\x80-\uffff]*|-?(?:\.\d+|\d+(?:\.\d*)?)')
+_DOT_KEYWORDS = frozenset({'node', 'edge', 'graph', 'digraph', 'subgraph', 'strict'})
+
+
+def visualize_automaton(automaton, automaton_type, filename="automaton_visualization", force=False,
+                        output_format="png"):
+    """
+    Renders a DFA or NFA to ``<filename>.<output_format>``, drawing final
+    states as double circles and an arrow into the initial state. Rendering
+    problems are reported on stderr rather than raised.
+
+    A hash of the DOT source is kept in ``<filename>.<output_format>.hash``,
+    and rendering is skipped if the output was made from the same source,
+    unless ``force`` is set.
+    """
+    # The DOT text is written out directly, going through graphviz.Digraph costs
+    # several method calls and an attribute dict per node and edge
+    parts = [
+        f'// {automaton_type.upper()} Visualization',
+        'digraph {',
+        '\tnode [shape=circle]',
+        '\trankdir=LR',
+        # Add invisible start node and edge to initial state
+        '\tstart [height=0 shape=none width=0]',
+        f'\tstart -> {_quote(automaton.initial)}',
+    ]
+
+    # Add nodes and transitions in sorted order, the automaton's sets iterate in a
+    # different order in every process and the source hash below must not change
+    final = automaton.final
+    for state in sorted(automaton.states, key=str):
+        if state in final:
+            parts.append(f'\t{_quote(state)} [shape=doublecircle]')
+        else:
+            parts.append(f'\t{_quote(state)}')
+
+    transitions = sorted(automaton.transitions.items(), key=_transition_key)
+    if automaton_type == 'dfa':
+        for (state, symbol), next_state in transitions:
+            parts.append(f'\t{_quote(state)} -> {_quote(next_state)} [label={_quote(symbol)}]')
+    elif automaton_type == 'nfa':
+        for (state, symbol), next_states in transitions:
+            for next_state in sorted(next_states, key=str):
+                parts.append(f'\t{_quote(state)} -> {_quote(next_state)} [label={_quote(symbol)}]')
+    parts.append('}\n')
+    source = '\n'.join(parts)
+
+    output_path = f"{filename}.{output_format}"
+    stamp_path = f"{output_path}.hash"
+    digest = hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+    if not force and is_up_to_date(stamp_path, digest, [output_path]):
+        print(f"Visualization {output_path} is up to date, skipping.")
+        return
+
+    import graphviz
+    dot = graphviz.Source(source)
+    try:
+        render_batch([(dot, filename)], formats=(output_format,))
+        write_stamp(stamp_path, digest)
+        print(f"Visualization saved to {output_path}")
+    except graphviz.ExecutableNotFound:
+        print(f"Warning: Graphviz executable 'dot' not found. Cannot generate visualization. Please ensure Graphviz is installed and in your system's PATH.", file=sys.stderr)
+    except Exception as e:
+        print(f"An error occurred during visualization: {e}", file=sys.stderr)
+
+
+def render_batch(graphs, formats=("png",)):
+    """
+    Renders every (graph, filename) pair to each of the given formats with a
+    single dot process and returns the paths written.
+
+    Outputs are named ``<filename>.<format>`` like :meth:`graphviz.Graph.render`
+    and the saved sources are removed afterwards. When pygraphviz is installed
+    the Graphviz library renders in-process instead and no dot process is
+    started at all.
+    """
+    try:
+        from pygraphviz import AGraph
+    except ImportError:
+        pass
+    else:
+        return _render_in_process(AGraph, graphs, formats)
+    import graphviz
+    paths = [graph.save(filename) for graph, filename in graphs]
+    if not paths:
+        return []
+    cmd = ["dot", "-Kdot", *(f"-T{fmt}" for fmt in formats), "-O", *paths]
+    try:
+        proc = subprocess.run(cmd, capture_output=True)
+    except FileNotFoundError as e:
+        raise graphviz.ExecutableNotFound(cmd) from e
+    finally:
+        for path in paths:
+            os.remove(path)
+    if proc.returncode:
+        raise graphviz.CalledProcessError(
+            proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr
+        )
+    return [f"{path}.{fmt}" for path in paths for fmt in formats]
+
+
+def is_up_to_date(stamp_path, digest, outputs):
+    """
+    Returns True if the stamp file records the given digest and every output
+    it was written for still exists.
+    """
+    try:
+        with open(stamp_path, "r") as f:
+            stamp = f.read().strip()
+    except FileNotFoundError:
+        return False
+    return stamp == digest and all(os.path.exists(path) for path in outputs)
+
+
+def write_stamp(stamp_path, digest):
+    """Atomically records the digest the current outputs were rendered from"""
+    tmp_path = f"{stamp_path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(digest)
+    os.replace(tmp_path, stamp_path)
+
+
+def _render_in_process(AGraph, graphs, formats):
+    # Lay each graph out once and write every format from that layout
+    outputs = []
+    for graph, filename in graphs:
+        agraph = AGraph(string=graph.source)
+        agraph.layout(prog="dot")
+        for fmt in formats:
+            path = f"{filename}.{fmt}"
+            agraph.draw(path, format=fmt)
+            outputs.append(path)
+    return outputs
+
+
+def _quote(name):
+    # Quote IDs that DOT would not read back as a single plain name
+    name = str(name)
+    if _PLAIN_ID_RE.fullmatch(name) and name.lower() not in _DOT_KEYWORDS:
+        return name
+    return '"' + name.replace('"', '\\"') + '"'
+
+
+def _transition_key(item):
+    (state, symbol), _ = item
+    return str(state), str(symbol)
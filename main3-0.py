@@ -2,173 +2,69 @@ import argparse
 import sys
 import os
 import json
+import re
+from collections import defaultdict
+from functools import lru_cache
 from python_fsa import DFA, NFA
-import graphviz
+from dot_lex import lex_dot
+from fsa_viz import visualize_automaton, OUTPUT_FORMATS
+from dfa_run import compile_automaton
+from fsa_json import deserialize_automaton, dump, loads
 
-def serialize_automaton(automaton):
-    # Convert automaton object to a dictionary for JSON serialization
-    data = {
-        "type": "dfa" if isinstance(automaton, DFA) else "nfa",
-        "alphabet": list(automaton.alphabet),
-        "states": list(automaton.states),
-        "initial": automaton.initial,
-        "final": list(automaton.final),
-        "transitions": {}
-    }
-    for (state, symbol), next_state_or_states in automaton.transitions.items():
-        key = f"{state},{symbol}"
-        if isinstance(automaton, DFA):
-            data["transitions"][key] = next_state_or_states
-        else: # NFA
-            data["transitions"][key] = list(next_state_or_states)
-    return data
-
-def deserialize_automaton(data):
-    # Reconstruct automaton object from a dictionary
-    automaton_type = data["type"]
-    alphabet = tuple(data["alphabet"])
-    states = tuple(data["states"])
-    initial = data["initial"]
-    final = tuple(data["final"])
-    transitions = {}
-
-    for key, value in data["transitions"].items():
-        state, symbol = key.split(',')
-        if automaton_type == "dfa":
-            transitions[(state, symbol)] = value
-        else: # NFA
-            transitions[(state, symbol)] = tuple(value)
-
-    if automaton_type == "dfa":
-        return DFA(alphabet=alphabet, states=states, initial=initial, final=final, transitions=transitions)
-    else:
-        return NFA(alphabet=alphabet, states=states, initial=initial, final=final, transitions=transitions)
-
-def visualize_automaton(automaton, automaton_type, filename="automaton_visualization"):
-    dot = graphviz.Digraph(comment=f'{automaton_type.upper()} Visualization')
-    dot.attr('node', shape='circle')
-    dot.attr(rankdir='LR')
-
-    # Add invisible start node and edge to initial state
-    dot.node('start', shape='none', width='0', height='0')
-    dot.edge('start', automaton.initial)
-
-    # Add nodes
-    for state in automaton.states:
-        if state in automaton.final:
-            dot.node(state, shape='doublecircle')
-        else:
-            dot.node(state)
-
-    # Add transitions
-    if automaton_type == 'dfa':
-        for (state, symbol), next_state in automaton.transitions.items():
-            dot.edge(state, next_state, label=str(symbol))
-    elif automaton_type == 'nfa':
-        for (state, symbol), next_states in automaton.transitions.items():
-            for next_state in next_states:
-                dot.edge(state, next_state, label=str(symbol))
-
-    output_path = f"{filename}.png"
-    try:
-        dot.render(filename, view=False, format='png', cleanup=True)
-        print(f"Visualization saved to {output_path}")
-    except graphviz.backend.gv.ExecutableNotFound:
-        print(f"Warning: Graphviz executable 'dot' not found. Cannot generate visualization. Please ensure Graphviz is installed and in your system's PATH.", file=sys.stderr)
-    except Exception as e:
-        print(f"An error occurred during visualization: {e}", file=sys.stderr)
+# Separator between the symbols of an edge label such as "0, 1"
+_LABEL_RE = re.compile(r'\s*,\s*')
 
 def parse_dot_file(dot_filepath):
     try:
-        with open(dot_filepath, 'r') as f:
-            dot_source = f.read()
-        
-        # Use graphviz.Source to parse the dot file
-        graph = graphviz.Source(dot_source)
-        
-        # This is a simplified parsing. A robust parser would need to handle
-        # all DOT syntax variations, subgraphs, attributes, etc.
-        # For this example, we'll assume a basic structure as seen in dfa_example.gv and nfa_example.gv
-
+        # The file is tokenized statement by statement, see dot_lex.lex_dot for the
+        # DOT subset understood, e.g. the files in assets/dot_files
         states = set()
         alphabet = set()
-        transitions = {}
+        transitions = defaultdict(list)
         initial_state = None
         final_states = set()
         automaton_type = 'dfa' # Assume DFA unless NFA characteristics are found
+        # Final states are double circles, set on the node or by a `node [shape = ...]` default before it
+        node_shape = None
 
-        # Parse nodes and initial/final states
-        # This part is tricky as graphviz.Source doesn't directly expose parsed AST
-        # We'll rely on string parsing for simplicity, but it's brittle.
-        lines = dot_source.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith('node [shape = doublecircle]'):
-                parts = line.split(';')
-                for part in parts:
-                    if 'doublecircle' in part:
-                        state_name = part.replace('node [shape = doublecircle]', '').strip()
-                        if state_name:
-                            final_states.add(state_name)
-                            states.add(state_name)
-            elif line.startswith('node [shape = circle]'):
-                # Regular states, already added if they are final or in transitions
-                pass
-            elif '->' in line and not line.startswith('null ->'):
-                # Parse transitions
-                parts = line.split('->')
-                from_state = parts[0].strip()
-                to_part = parts[1].strip()
-
-                label_match = to_part.split('label = "')
-                if len(label_match) > 1:
-                    label_str = label_match[1].split('"')[0]
-                    to_state = label_match[0].strip().replace(' [', '').strip()
-                else:
-                    to_state = to_part.strip()
-                    label_str = "" # Epsilon transition or unlabeled
-                
-                symbols = tuple(s.strip() for s in label_str.split(',')) if label_str else ("",)
-
-                states.add(from_state)
-                states.add(to_state)
-                for symbol in symbols:
-                    if symbol:
-                        alphabet.add(symbol)
-
-                for symbol in symbols:
-                    current_transitions = transitions.get((from_state, symbol), [])
-                    current_transitions.append(to_state)
-                    transitions[(from_state, symbol)] = current_transitions
-                    
-                    # Check for NFA characteristics
-                    if len(current_transitions) > 1:
-                        automaton_type = 'nfa'
-
-            elif line.startswith('null ->'):
-                initial_state = line.replace('null ->', '').strip().replace(';', '').strip()
-                states.add(initial_state)
+        with open(dot_filepath, 'r') as f:
+            for kind, value in lex_dot(f):
+                if kind == 'defaults':
+                    target, attrs = value
+                    if target == 'node':
+                        node_shape = attrs.get('shape', node_shape)
+                elif kind == 'node_decl':
+                    state, attrs = value
+                    states.add(state)
+                    if attrs.get('shape', node_shape) == 'doublecircle':
+                        final_states.add(state)
+                elif kind == 'edge':
+                    from_state, to_state, attrs = value
+                    states.add(from_state)
+                    states.add(to_state)
+
+                    label_str = attrs.get('label', '').strip()
+                    symbols = _LABEL_RE.split(label_str) if label_str else ("",) # Epsilon transition or unlabeled
+                    for symbol in symbols:
+                        if symbol:
+                            alphabet.add(symbol)
+                        next_states = transitions[(from_state, symbol)]
+                        next_states.append(to_state)
+
+                        # Check for NFA characteristics
+                        if len(next_states) > 1:
+                            automaton_type = 'nfa'
+                elif kind == 'initial':
+                    initial_state = value
+                    states.add(initial_state)
 
         # Convert transition lists to tuples/single values
-        processed_transitions = {}
-        for (state, symbol), next_states_list in transitions.items():
-            if automaton_type == 'dfa':
-                if len(next_states_list) != 1:
-                    raise ValueError(f"DFA transition from {state} on {symbol} leads to multiple states: {next_states_list}. This is not a valid DFA.")
-                processed_transitions[(state, symbol)] = next_states_list[0]
-            else:
-                processed_transitions[(state, symbol)] = tuple(sorted(set(next_states_list))) # Remove duplicates and sort for consistency
-
-        # Ensure all states in transitions are in the states set
-        for (s, _), next_s in processed_transitions.items():
-            if s not in states:
-                states.add(s)
-            if isinstance(next_s, tuple):
-                for ns in next_s:
-                    if ns not in states:
-                        states.add(ns)
-            elif next_s not in states:
-                states.add(next_s)
+        if automaton_type == 'dfa':
+            # Every list has exactly one state, a second one would have made this an NFA
+            processed_transitions = {key: next_states_list[0] for key, next_states_list in transitions.items()}
+        else:
+            # Remove duplicates and sort for consistency
+            processed_transitions = {key: tuple(sorted(set(next_states_list))) for key, next_states_list in transitions.items()}
 
         if automaton_type == 'dfa':
             return DFA(
@@ -203,6 +99,8 @@ def main():
     parser.add_argument('--final', help="Comma-separated list of final state names. Required if not loading from file or DOT file.")
     parser.add_argument('--transitions', nargs='+', help="List of transitions, each in the format 'state,symbol,next_state' (e.g., q0,0,q1 q0,1,q2). For NFAs, you can specify multiple next states like 'q0,1,q0,q1'. Required if not loading from file or DOT file.")
     parser.add_argument('--output-file', help="Optional: Filename for the visualization (e.g., 'my_automaton'). Default is 'automaton_visualization'.")
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='png', help="Format of the visualization. SVG renders considerably faster than PNG. Default is 'png'.")
+    parser.add_argument('--force-render', action='store_true', help="Render the visualization even if an up-to-date one from the same automaton exists.")
     parser.add_argument('--skip-visualization', action='store_true', help="Skip generating the visualization image.")
     parser.add_argument('--save-to', help="Optional: Save the created automaton to a JSON file.")
     parser.add_argument('--load-from', help="Optional: Load an automaton from a JSON file. If provided, other automaton definition arguments are ignored.")
@@ -215,8 +113,8 @@ def main():
 
     if args.load_from:
         try:
-            with open(args.load_from, 'r') as f:
-                data = json.load(f)
+            with open(args.load_from, 'rb') as f:
+                data = loads(f.read())
             automaton = deserialize_automaton(data)
             automaton_type = data["type"]
             print(f"\nAutomaton loaded successfully from {args.load_from}!")
@@ -243,13 +141,15 @@ def main():
         states = tuple(s.strip() for s in args.states.split(','))
         initial = args.initial.strip()
         final_states = tuple(s.strip() for s in args.final.split(','))
+        states_set = frozenset(states)
+        alphabet_set = frozenset(alphabet)
 
-        if initial not in states:
+        if initial not in states_set:
             print(f"Error: Initial state '{initial}' is not in the list of defined states: {states}", file=sys.stderr)
             sys.exit(1)
 
         for state in final_states:
-            if state not in states:
+            if state not in states_set:
                 print(f"Error: Final state '{state}' is not in the list of defined states: {states}", file=sys.stderr)
                 sys.exit(1)
 
@@ -262,13 +162,13 @@ def main():
                     print(f"Error: Invalid DFA transition format: '{t}'. Expected 'state,symbol,next_state'.", file=sys.stderr)
                     sys.exit(1)
                 state, symbol, next_state = parts
-                if state not in states:
+                if state not in states_set:
                     print(f"Error: Transition '{t}': State '{state}' is not defined in states: {states}", file=sys.stderr)
                     sys.exit(1)
-                if symbol not in alphabet:
+                if symbol not in alphabet_set:
                     print(f"Error: Transition '{t}': Symbol '{symbol}' is not defined in alphabet: {alphabet}", file=sys.stderr)
                     sys.exit(1)
-                if next_state not in states:
+                if next_state not in states_set:
                     print(f"Error: Transition '{t}': Next state '{next_state}' is not defined in states: {states}", file=sys.stderr)
                     sys.exit(1)
                 if (state, symbol) in transitions:
@@ -276,6 +176,7 @@ def main():
                     sys.exit(1)
                 transitions[(state, symbol)] = next_state
         else: # NFA
+            transitions = defaultdict(list)
             for t in args.transitions:
                 parts = tuple(s.strip() for s in t.split(','))
                 if len(parts) < 3:
@@ -284,21 +185,18 @@ def main():
                 state, symbol = parts[0], parts[1]
                 next_states_for_transition = tuple(parts[2:])
 
-                if state not in states:
+                if state not in states_set:
                     print(f"Error: Transition '{t}': State '{state}' is not defined in states: {states}", file=sys.stderr)
                     sys.exit(1)
-                if symbol not in alphabet:
+                if symbol not in alphabet_set:
                     print(f"Error: Transition '{t}': Symbol '{symbol}' is not defined in alphabet: {alphabet}", file=sys.stderr)
                     sys.exit(1)
                 for ns in next_states_for_transition:
-                    if ns not in states:
+                    if ns not in states_set:
                         print(f"Error: Transition '{t}': Next state '{ns}' is not defined in states: {states}", file=sys.stderr)
                         sys.exit(1)
                 
-                if (state, symbol) in transitions:
-                    transitions[(state, symbol)] += next_states_for_transition
-                else:
-                    transitions[(state, symbol)] = next_states_for_transition
+                transitions[(state, symbol)].extend(next_states_for_transition)
 
         # --- Create Automaton ---
         if automaton_type == 'dfa':
@@ -323,8 +221,8 @@ def main():
     # --- Save Automaton (if requested) ---
     if args.save_to:
         try:
-            with open(args.save_to, 'w') as f:
-                json.dump(serialize_automaton(automaton), f, indent=4)
+            with open(args.save_to, 'wb') as f:
+                dump(automaton, f)
             print(f"Automaton saved to {args.save_to}")
         except Exception as e:
             print(f"Error saving automaton to file: {e}", file=sys.stderr)
@@ -332,13 +230,22 @@ def main():
     # --- Visualization (if not skipped) ---
     if not args.skip_visualization:
         output_filename = args.output_file if args.output_file else f"{automaton_type}_visualization"
-        visualize_automaton(automaton, automaton_type, output_filename)
+        visualize_automaton(automaton, automaton_type, output_filename, force=args.force_render,
+                            output_format=args.output_format)
 
     # --- Interactive Testing ---
+    # Run inputs against an integer-indexed transition table instead of the automaton's dict
+    compiled = compile_automaton(automaton)
+    sym_ix = compiled.sym_ix
+
+    # Inputs entered again are answered from the cache, an unknown symbol raises KeyError
+    @lru_cache(maxsize=4096)
+    def accepts(input_symbols):
+        return compiled.accepts_indices([sym_ix[s] for s in input_symbols])
     print("\n--- Interactive Testing ---")
     print(f"Enter strings over the alphabet {automaton.alphabet} (comma-separated for multi-character symbols, e.g., 'a,b,c').")
     print("Type 'exit' to quit.")
-    print("Type 'step' to process input symbol by symbol.")
+    print("Type 'step' to process input symbol by symbol (several space-separated symbols at a time).")
     while True:
         try:
             user_input = input("> ").strip()
@@ -347,34 +254,42 @@ def main():
             if not user_input:
                 continue
             
-            input_symbols = tuple(user_input.split(',')) if ',' in user_input else tuple(user_input)
-
-            # Validate input symbols against the automaton's alphabet
-            invalid_symbols = [s for s in input_symbols if s not in automaton.alphabet]
-            if invalid_symbols:
-                print(f"Error: Input contains symbols not in the defined alphabet {automaton.alphabet}: {invalid_symbols}", file=sys.stderr)
-                continue
-
             if user_input.lower() == 'step':
                 print("\n--- Step-by-Step Execution ---")
-                current_transducer = automaton.transducer()
-                current_state = current_transducer.current
-                print(f"Initial state: {current_state}")
-                step_input = input(f"Enter symbol to process (or 'done'): ").strip()
+                # Steps walk the compiled table as well, a whitespace-separated batch of
+                # symbols is traced in one call
+                current_state = compiled.initial
+                print(f"Initial state: {compiled.name_of(current_state)}")
+                step_input = input(f"Enter symbol(s) to process (or 'done'): ").strip()
                 while step_input.lower() != 'done':
-                    if step_input not in automaton.alphabet:
-                        print(f"Error: Symbol '{step_input}' not in alphabet {automaton.alphabet}", file=sys.stderr)
+                    step_symbols = step_input.split()
+                    try:
+                        step_syms = [sym_ix[s] for s in step_symbols]
+                    except KeyError:
+                        invalid_symbols = [s for s in step_symbols if s not in sym_ix]
+                        print(f"Error: Symbol(s) {invalid_symbols} not in alphabet {automaton.alphabet}", file=sys.stderr)
                     else:
-                        current_transducer.push(step_input)
-                        current_state = current_transducer.current
-                        print(f"Processed '{step_input}'. Current state: {current_state}. Accepting: {current_transducer.is_accepting}")
-                    step_input = input(f"Enter symbol to process (or 'done'): ").strip()
+                        visited = compiled.trace_indices(current_state, step_syms)
+                        for symbol, current_state in zip(step_symbols, visited[1:]):
+                            print(f"Processed '{symbol}'. Current state: {compiled.name_of(current_state)}. Accepting: {compiled.is_final(current_state)}")
+                    step_input = input(f"Enter symbol(s) to process (or 'done'): ").strip()
                 print("--- End Step-by-Step Execution ---")
+                continue
+
+            input_symbols = user_input.split(',') if ',' in user_input else user_input
+
+            # Validate input symbols against the automaton's alphabet while mapping them to indices
+            try:
+                accepted = accepts(tuple(input_symbols))
+            except KeyError:
+                invalid_symbols = [s for s in input_symbols if s not in sym_ix]
+                print(f"Error: Input contains symbols not in the defined alphabet {automaton.alphabet}: {invalid_symbols}", file=sys.stderr)
+                continue
+
+            if accepted:
+                print("  -> Accepted")
             else:
-                if automaton.accepts(input_symbols):
-                    print("  -> Accepted")
-                else:
-                    print("  -> Rejected")
+                print("  -> Rejected")
         except (EOFError, KeyboardInterrupt):
             break
         except Exception as e:
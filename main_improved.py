@@ -1,37 +1,10 @@
 import argparse
 import sys
 import os
+from collections import defaultdict
 from python_fsa import DFA, NFA
-import graphviz
-
-def visualize_automaton(automaton, automaton_type, filename="automaton_visualization"):
-    dot = graphviz.Digraph(comment=f'{automaton_type.upper()} Visualization')
-    dot.attr('node', shape='circle')
-    dot.attr(rankdir='LR')
-
-    # Add invisible start node and edge to initial state
-    dot.node('start', shape='none', width='0', height='0')
-    dot.edge('start', automaton.initial)
-
-    # Add nodes
-    for state in automaton.states:
-        if state in automaton.final:
-            dot.node(state, shape='doublecircle')
-        else:
-            dot.node(state)
-
-    # Add transitions
-    if automaton_type == 'dfa':
-        for (state, symbol), next_state in automaton.transitions.items():
-            dot.edge(state, next_state, label=str(symbol))
-    elif automaton_type == 'nfa':
-        for (state, symbol), next_states in automaton.transitions.items():
-            for next_state in next_states:
-                dot.edge(state, next_state, label=str(symbol))
-
-    output_path = f"{filename}.png"
-    dot.render(filename, view=False, format='png', cleanup=True)
-    print(f"Visualization saved to {output_path}")
+from fsa_viz import visualize_automaton, OUTPUT_FORMATS
+from dfa_run import compile_automaton
 
 def main():
     parser = argparse.ArgumentParser(description="Create and test a Finite State Automaton.")
@@ -42,6 +15,8 @@ def main():
     parser.add_argument('--final', required=True, help="Comma-separated list of final state names.")
     parser.add_argument('--transitions', required=True, nargs='+', help="List of transitions, each in the format 'state,symbol,next_state' (e.g., q0,0,q1 q0,1,q2). For NFAs, you can specify multiple next states like 'q0,1,q0,q1'.")
     parser.add_argument('--output-file', help="Optional: Filename for the visualization (e.g., 'my_automaton'). Default is 'automaton_visualization'.")
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='png', help="Format of the visualization. SVG renders considerably faster than PNG. Default is 'png'.")
+    parser.add_argument('--force-render', action='store_true', help="Render the visualization even if an up-to-date one from the same automaton exists.")
 
     args = parser.parse_args()
 
@@ -50,13 +25,15 @@ def main():
     states = tuple(s.strip() for s in args.states.split(','))
     initial = args.initial.strip()
     final_states = tuple(s.strip() for s in args.final.split(','))
+    states_set = frozenset(states)
+    alphabet_set = frozenset(alphabet)
 
-    if initial not in states:
+    if initial not in states_set:
         print(f"Error: Initial state '{initial}' is not in the list of defined states: {states}")
         sys.exit(1)
 
     for state in final_states:
-        if state not in states:
+        if state not in states_set:
             print(f"Error: Final state '{state}' is not in the list of defined states: {states}")
             sys.exit(1)
 
@@ -69,13 +46,13 @@ def main():
                 print(f"Error: Invalid DFA transition format: '{t}'. Expected 'state,symbol,next_state'.")
                 sys.exit(1)
             state, symbol, next_state = parts
-            if state not in states:
+            if state not in states_set:
                 print(f"Error: Transition '{t}': State '{state}' is not defined in states: {states}")
                 sys.exit(1)
-            if symbol not in alphabet:
+            if symbol not in alphabet_set:
                 print(f"Error: Transition '{t}': Symbol '{symbol}' is not defined in alphabet: {alphabet}")
                 sys.exit(1)
-            if next_state not in states:
+            if next_state not in states_set:
                 print(f"Error: Transition '{t}': Next state '{next_state}' is not defined in states: {states}")
                 sys.exit(1)
             if (state, symbol) in transitions:
@@ -83,6 +60,7 @@ def main():
                 sys.exit(1)
             transitions[(state, symbol)] = next_state
     else: # NFA
+        transitions = defaultdict(list)
         for t in args.transitions:
             parts = tuple(s.strip() for s in t.split(','))
             if len(parts) < 3:
@@ -91,21 +69,18 @@ def main():
             state, symbol = parts[0], parts[1]
             next_states_for_transition = tuple(parts[2:])
 
-            if state not in states:
+            if state not in states_set:
                 print(f"Error: Transition '{t}': State '{state}' is not defined in states: {states}")
                 sys.exit(1)
-            if symbol not in alphabet:
+            if symbol not in alphabet_set:
                 print(f"Error: Transition '{t}': Symbol '{symbol}' is not defined in alphabet: {alphabet}")
                 sys.exit(1)
             for ns in next_states_for_transition:
-                if ns not in states:
+                if ns not in states_set:
                     print(f"Error: Transition '{t}': Next state '{ns}' is not defined in states: {states}")
                     sys.exit(1)
             
-            if (state, symbol) in transitions:
-                transitions[(state, symbol)] += next_states_for_transition
-            else:
-                transitions[(state, symbol)] = next_states_for_transition
+            transitions[(state, symbol)].extend(next_states_for_transition)
 
     # --- Create Automaton ---
     automaton = None
@@ -130,9 +105,13 @@ def main():
 
     # --- Visualization ---
     output_filename = args.output_file if args.output_file else f"{args.type}_visualization"
-    visualize_automaton(automaton, args.type, output_filename)
+    visualize_automaton(automaton, args.type, output_filename, force=args.force_render,
+                        output_format=args.output_format)
 
     # --- Interactive Testing ---
+    # Run inputs against an integer-indexed transition table instead of the automaton's dict
+    compiled = compile_automaton(automaton)
+    sym_ix = compiled.sym_ix
     print("\n--- Interactive Testing ---")
     print(f"Enter strings over the alphabet {alphabet} (comma-separated for multi-character symbols, e.g., 'a,b,c').")
     print("Type 'exit' to quit.")
@@ -144,15 +123,17 @@ def main():
             if not user_input:
                 continue
             
-            input_symbols = tuple(user_input.split(',')) if ',' in user_input else tuple(user_input)
+            input_symbols = user_input.split(',') if ',' in user_input else user_input
 
-            # Validate input symbols against the automaton's alphabet
-            invalid_symbols = [s for s in input_symbols if s not in alphabet]
-            if invalid_symbols:
+            # Validate input symbols against the automaton's alphabet while mapping them to indices
+            try:
+                syms = [sym_ix[s] for s in input_symbols]
+            except KeyError:
+                invalid_symbols = [s for s in input_symbols if s not in sym_ix]
                 print(f"Error: Input contains symbols not in the defined alphabet {alphabet}: {invalid_symbols}")
                 continue
 
-            if automaton.accepts(input_symbols):
+            if compiled.accepts_indices(syms):
                 print("  -> Accepted")
             else:
                 print("  -> Rejected")
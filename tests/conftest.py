@@ -0,0 +1,24 @@
+import pytest
+
+import fsa_viz
+
+
+@pytest.fixture
+def fake_render(monkeypatch):
+    """
+    Replaces Graphviz rendering with creating empty output files, for tests
+    that only check a visualization is written. Returns the list of DOT
+    sources rendered so far.
+    """
+    sources = []
+    def render_batch(graphs, formats=("png",)):
+        paths = []
+        for graph, filename in graphs:
+            sources.append(graph.source)
+            for fmt in formats:
+                path = f"{filename}.{fmt}"
+                open(path, "wb").close()
+                paths.append(path)
+        return paths
+    monkeypatch.setattr(fsa_viz, "render_batch", render_batch)
+    return sources
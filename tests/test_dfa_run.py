@@ -0,0 +1,116 @@
+from itertools import product
+
+from python_fsa import DFA, NFA
+from dfa_run import compile_automaton, compile_dfa, CompiledNFA
+
+
+def all_inputs(alphabet, max_length=6):
+    for length in range(max_length + 1):
+        yield from product(alphabet, repeat=length)
+
+def test_compiled_dfa_matches_dfa():
+    a, b, c = "a", "b", "c"
+    dfa = DFA(
+        alphabet=(0, 1),
+        states=(a, b, c),
+        initial=a,
+        transitions={
+            (a, 0): a,
+            (a, 1): b,
+            (b, 0): c,
+            (c, 1): a,
+        },  # partial: (b, 1) and (c, 0) are missing
+        final=(a, c),
+    )
+    compiled = compile_dfa(dfa)
+    for input_symbols in all_inputs((0, 1)):
+        expected = dfa.accepts(input_symbols)
+        assert compiled.accepts(input_symbols) == expected
+        syms = [compiled.sym_ix[s] for s in input_symbols]
+        assert compiled.accepts_indices(syms) == expected
+
+def test_compiled_nfa_matches_nfa():
+    a, b, c = "a", "b", "c"
+    nfa = NFA(
+        alphabet=(0, 1),
+        states=(a, b, c),
+        initial=a,
+        transitions={
+            (a, 0): (a,),
+            (a, 1): (a, b),
+            (b, 0): (c,),
+            (b, 1): (c,),
+        },
+        final=(c,),
+    )
+    compiled = compile_dfa(nfa)
+    for input_symbols in all_inputs((0, 1)):
+        assert compiled.accepts(input_symbols) == nfa.accepts(input_symbols)
+
+def test_unknown_symbol_rejects():
+    dfa = DFA(alphabet=("0",), states=("q",), initial="q",
+              transitions={("q", "0"): "q"}, final=("q",))
+    compiled = compile_dfa(dfa)
+    assert compiled.accepts(("0", "0"))
+    assert not compiled.accepts(("0", "x"))
+
+def test_trace_indices_visits_each_state():
+    dfa = DFA(alphabet=("0", "1"), states=("a", "b"), initial="a",
+              transitions={("a", "1"): "b", ("b", "0"): "b"}, final=("b",))
+    compiled = compile_dfa(dfa)
+    a, b = compiled.state_ix["a"], compiled.state_ix["b"]
+    syms = [compiled.sym_ix[s] for s in ("1", "0", "1", "0")]
+    assert compiled.trace_indices(a, syms) == [a, b, b, -1, -1]
+    assert compiled.trace_indices(b, []) == [b]
+    assert compiled.is_final(b) and not compiled.is_final(a)
+    assert not compiled.is_final(-1)
+
+def test_compiled_nfa_runs_without_determinizing():
+    a, b, c, d = "a", "b", "c", "d"
+    nfa = NFA(
+        alphabet=(0, 1),
+        states=(a, b, c, d),
+        initial=a,
+        transitions={
+            (a, 0): (a,),
+            (a, 1): (a, b),
+            (a, NFA.EPSILON): (d,),
+            (b, 0): (c,),
+            (b, 1): (c,),
+            (d, 0): (d,),
+        },
+        final=(c,),
+    )
+    compiled = compile_automaton(nfa)
+    assert isinstance(compiled, CompiledNFA)
+    for input_symbols in all_inputs((0, 1)):
+        assert compiled.accepts(input_symbols) == nfa.accepts(input_symbols)
+    assert not compiled.accepts((1, NFA.EPSILON))
+
+    syms = [compiled.sym_ix[s] for s in (1, 0)]
+    visited = compiled.trace_indices(compiled.initial, syms)
+    assert [compiled.name_of(state) for state in visited] == [{a, d}, {a, b}, {a, c, d}]
+    assert compiled.is_final(visited[-1]) and not compiled.is_final(visited[0])
+
+def test_compiled_nfa_with_exponential_dfa():
+    # The n-th symbol from the end is a 1, its DFA has 2**n states
+    n = 30
+    transitions = {(0, "0"): (0,), (0, "1"): (0, 1)}
+    for i in range(1, n):
+        transitions[(i, "0")] = transitions[(i, "1")] = (i + 1,)
+    nfa = NFA(alphabet=("0", "1"), states=range(n + 1), initial=0,
+              transitions=transitions, final=(n,))
+    compiled = compile_automaton(nfa)
+    assert compiled.accepts("1" + "0" * (n - 1))
+    assert not compiled.accepts("0" * n)
+
+def test_symbols_outside_the_alphabet_are_not_compiled():
+    # An unlabeled DOT edge gives a transition on '', which isn't in the alphabet
+    dfa = DFA(alphabet=("0",), states=("a", "b"), initial="a",
+              transitions={("a", "0"): "a", ("a", ""): "b"}, final=("a", "b"))
+    nfa = NFA(alphabet=("0",), states=("a", "b"), initial="a",
+              transitions={("a", "0"): ("a",), ("a", ""): ("b",)}, final=("b",))
+    for automaton in (dfa, nfa):
+        compiled = compile_automaton(automaton)
+        assert set(compiled.sym_ix) == {"0"}
+        assert not compiled.accepts(("",))
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pytest
+
+import dot_customizer
+import fsa_viz
+from dot_customizer import customize_dot_file
+from dot_lex import lex_dot
+
+NFA_TO_DFA = Path(__file__).parent.parent / "assets" / "dot_files" / "nfa_to_dfa.gv"
+
+@pytest.fixture
+def customizer_render(fake_render, monkeypatch):
+    # dot_customizer holds its own reference to render_batch
+    monkeypatch.setattr(dot_customizer, "render_batch", fsa_viz.render_batch)
+    return fake_render
+
+def test_customize_without_png_restyles_a_copy_of_the_source(tmp_path):
+    source = NFA_TO_DFA.read_text()
+    output_base = str(tmp_path / "out")
+    customize_dot_file(str(NFA_TO_DFA), output_base)
+
+    customized = (tmp_path / "out.dot").read_text()
+    assert customized.startswith(source[:source.rindex('}')])
+    tokens = list(lex_dot(customized.splitlines(keepends=True)))
+    assert tokens[-1] == ('node_decl', ('A', {'color': 'red', 'style': 'filled'}))
+
+def test_customize_with_png_rebuilds_the_graph(tmp_path, customizer_render):
+    output_base = str(tmp_path / "out")
+    customize_dot_file(str(NFA_TO_DFA), output_base, output_base)
+
+    assert (tmp_path / "out.png").is_file()
+    saved = (tmp_path / "out.dot").read_text()
+    (source,) = customizer_render
+    assert saved == source
+    lines = saved.splitlines()
+    assert "\trankdir=LR" in lines
+    assert lines.index("\tnode [fixedsize=true height=0.5 shape=doublecircle width=0.5]") < lines.index("\tAC")
+    assert lines.index("\tnode [fixedsize=true height=0.5 shape=circle width=0.5]") < lines.index("\tA")
+    assert '\t"" -> A' in lines
+    assert "\tAB -> ABC [label=1]" in lines
+    assert lines[-2] == "\tA [color=red style=filled]"
+
+def test_customize_skips_an_unchanged_input(tmp_path, customizer_render, capsys):
+    output_base = str(tmp_path / "out")
+    customize_dot_file(str(NFA_TO_DFA), output_base, output_base)
+    (tmp_path / "out.dot").write_text("stale")
+    customize_dot_file(str(NFA_TO_DFA), output_base, output_base)
+    assert len(customizer_render) == 1
+    assert f"{output_base}.png is up to date, skipping." in capsys.readouterr().out
+
+    stamp = (tmp_path / "out.hash").read_text()
+    customize_dot_file(str(NFA_TO_DFA), output_base, output_base, force=True)
+    assert len(customizer_render) == 2
+    assert (tmp_path / "out.dot").read_text() == customizer_render[1]
+    assert (tmp_path / "out.hash").read_text() == stamp
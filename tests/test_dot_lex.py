@@ -0,0 +1,115 @@
+import pytest
+
+from dot_lex import lex_dot
+
+NFA_TO_DFA = """
+digraph {
+    rankdir = LR;
+    node [shape = doublecircle; fixedsize = true]; AC ABC;
+    node [shape = circle; fixedsize = true]; A AB;
+    null [label = " ",shape = none,height = 0,width = 0];
+    {null rank = "min"};
+    null -> A;
+    A -> AB [label = "0, 1"];
+}
+"""
+
+def test_lex_dot_tokens():
+    tokens = list(lex_dot(NFA_TO_DFA.splitlines(keepends=True)))
+    assert tokens == [
+        ('graph_attr', ('rankdir', 'LR')),
+        ('defaults', ('node', {'shape': 'doublecircle', 'fixedsize': 'true'})),
+        ('node_decl', ('AC', {})),
+        ('node_decl', ('ABC', {})),
+        ('defaults', ('node', {'shape': 'circle', 'fixedsize': 'true'})),
+        ('node_decl', ('A', {})),
+        ('node_decl', ('AB', {})),
+        ('initial', 'A'),
+        ('edge', ('A', 'AB', {'label': '0, 1'})),
+    ]
+
+def test_lex_dot_ignores_separators_in_quotes():
+    tokens = list(lex_dot(['digraph { a -> b [label = "x; y]"]; }']))
+    assert tokens == [('edge', ('a', 'b', {'label': 'x; y]'}))]
+
+def test_lex_dot_attributes_spanning_lines():
+    lines = ['digraph {\n', '    a -> b [\n', '        label = "x; y",\n', '        color = red\n', '    ];\n', '}\n']
+    tokens = list(lex_dot(lines))
+    assert tokens == [('edge', ('a', 'b', {'label': 'x; y', 'color': 'red'}))]
+
+def test_lex_dot_quote_spanning_lines():
+    lines = ['digraph {\n', '    a -> b [label = "x;\n', 'y"];\n', '    c -> d;\n', '}\n']
+    tokens = list(lex_dot(lines))
+    assert [kind for kind, _ in tokens] == ['edge', 'edge']
+    assert tokens[1] == ('edge', ('c', 'd', {}))
+
+def test_lex_dot_rejects_unterminated_quote():
+    lines = ['digraph {\n', '    a [label = "x];\n'] + [f'    n{i} -> m{i};\n' for i in range(100)] + ['}\n']
+    with pytest.raises(ValueError, match="Unterminated"):
+        list(lex_dot(lines))
+
+def test_lex_dot_skips_subgraphs():
+    lines = [
+        'digraph {\n',
+        '    subgraph cluster_0 { x -> y; }\n',
+        '    a -> {b c} [label = "0"];\n',
+        '    {null rank = "min"};\n',
+        '    d -> e;\n',
+        '}\n',
+    ]
+    assert list(lex_dot(lines)) == [('edge', ('d', 'e', {}))]
+
+def test_lex_dot_splits_edge_chains():
+    tokens = list(lex_dot(['digraph { null -> a -> b -> c [label = "1"]; }']))
+    assert tokens == [
+        ('initial', 'a'),
+        ('edge', ('a', 'b', {'label': '1'})),
+        ('edge', ('b', 'c', {'label': '1'})),
+    ]
+
+def test_lex_dot_ignores_comments():
+    lines = [
+        '# preprocessor line\n',
+        'digraph {\n',
+        '    // a line comment; a -> b\n',
+        '    /* a block comment\n',
+        '       spanning lines; c -> d */\n',
+        '    a -> b; /* trailing */ b /* inline */ [label = "x"]  // end\n',
+        '    e [label = "http://example.com/#x"]\n',
+        '}\n',
+    ]
+    assert list(lex_dot(lines)) == [
+        ('edge', ('a', 'b', {})),
+        ('node_decl', ('b', {'label': 'x'})),
+        ('node_decl', ('e', {'label': 'http://example.com/#x'})),
+    ]
+
+def test_lex_dot_quoted_value_escapes():
+    lines = [
+        'digraph {\n',
+        '    a -> b [label = "x\\\n',
+        'y"];\n',
+        '    c [label = "\\"", xlabel = "a\\nb"];\n',
+        '}\n',
+    ]
+    assert list(lex_dot(lines)) == [
+        # A backslash-newline inside a quoted value is a line continuation
+        ('edge', ('a', 'b', {'label': 'xy'})),
+        ('node_decl', ('c', {'label': '"', 'xlabel': 'a\\nb'})),
+    ]
+
+def test_lex_dot_statement_after_attributes():
+    lines = [
+        'digraph {\n',
+        '    node [shape=circle] a b\n',
+        '    c [color=red] [shape=box] c -> d [label=x] d\n',
+        '}\n',
+    ]
+    assert list(lex_dot(lines)) == [
+        ('defaults', ('node', {'shape': 'circle'})),
+        ('node_decl', ('a', {})),
+        ('node_decl', ('b', {})),
+        ('node_decl', ('c', {'color': 'red', 'shape': 'box'})),
+        ('edge', ('c', 'd', {'label': 'x'})),
+        ('node_decl', ('d', {})),
+    ]
@@ -0,0 +1,74 @@
+import io
+
+from python_fsa import DFA, NFA
+from fsa_json import serialize_automaton, deserialize_automaton, dump, dumps, loads
+
+
+def roundtrip(automaton):
+    return deserialize_automaton(loads(dumps(serialize_automaton(automaton))))
+
+def test_dfa_roundtrip():
+    dfa = DFA(
+        alphabet=("0", "1"),
+        states=("a", "b"),
+        initial="a",
+        transitions={("a", "0"): "a", ("a", "1"): "b", ("b", "1"): "a"},
+        final=("a",),
+    )
+    loaded = roundtrip(dfa)
+    assert isinstance(loaded, DFA)
+    assert loaded.transitions == dfa.transitions
+    assert (loaded.alphabet, loaded.states, loaded.initial, loaded.final) == \
+        (dfa.alphabet, dfa.states, dfa.initial, dfa.final)
+
+def test_nfa_roundtrip():
+    nfa = NFA(
+        alphabet=("0", "1"),
+        states=("a", "b"),
+        initial="a",
+        transitions={("a", "0"): ("a", "b"), ("b", "1"): ("a",)},
+        final=("b",),
+    )
+    loaded = roundtrip(nfa)
+    assert isinstance(loaded, NFA)
+    assert loaded.transitions == nfa.transitions
+
+def test_reads_state_symbol_keyed_transitions():
+    data = {
+        "type": "nfa",
+        "alphabet": ["0"],
+        "states": ["a", "b"],
+        "initial": "a",
+        "final": ["b"],
+        "transitions": {"a,0": ["a", "b"]},
+    }
+    assert deserialize_automaton(data).transitions == {("a", "0"): frozenset(("a", "b"))}
+
+def test_dump_matches_serialized_layout():
+    nfa = NFA(
+        alphabet=("0", "1"),
+        states=("a", "b"),
+        initial="a",
+        transitions={("a", "0"): ("a", "b"), ("b", "1"): ("a",)},
+        final=("b",),
+    )
+    empty = DFA(alphabet=("0",), states=("a",), initial="a", transitions={}, final=())
+    for automaton in (nfa, empty):
+        f = io.BytesIO()
+        dump(automaton, f)
+        assert loads(f.getvalue()) == loads(dumps(serialize_automaton(automaton)))
+
+def test_dump_roundtrip_with_int_alphabet():
+    dfa = DFA(
+        alphabet=(0, 1),
+        states=("a", "b"),
+        initial="a",
+        transitions={("a", 0): "a", ("a", 1): "b", ("b", 1): "a"},
+        final=("b",),
+    )
+    f = io.BytesIO()
+    dump(dfa, f)
+    loaded = deserialize_automaton(loads(f.getvalue()))
+    assert loaded.alphabet == dfa.alphabet
+    assert loaded.transitions == dfa.transitions
+    assert loaded.accepts((1,)) and not loaded.accepts((1, 0))
@@ -0,0 +1,56 @@
+from python_fsa import DFA, NFA
+from fsa_viz import visualize_automaton
+
+
+def test_draws_final_states_and_initial_arrow(tmp_path, fake_render, capsys):
+    nfa = NFA(
+        alphabet=("0", "1"),
+        states=("a", "b"),
+        initial="a",
+        transitions={("a", "0"): ("a", "b"), ("b", "1"): ("a",)},
+        final=("b",),
+    )
+    filename = tmp_path / "nfa"
+    visualize_automaton(nfa, "nfa", str(filename), output_format="svg")
+
+    assert (tmp_path / "nfa.svg").is_file()
+    assert f"Visualization saved to {filename}.svg" in capsys.readouterr().out
+    (source,) = fake_render
+    lines = source.splitlines()
+    assert "\tstart -> a" in lines
+    assert "\tb [shape=doublecircle]" in lines
+    assert "\ta -> a [label=0]" in lines
+    assert "\ta -> b [label=0]" in lines
+    assert "\tb -> a [label=1]" in lines
+
+def test_skips_rendering_an_unchanged_automaton(tmp_path, fake_render, capsys):
+    dfa = DFA(
+        alphabet=("0",),
+        states=("a",),
+        initial="a",
+        transitions={("a", "0"): "a"},
+        final=("a",),
+    )
+    filename = str(tmp_path / "dfa")
+    visualize_automaton(dfa, "dfa", filename)
+    visualize_automaton(dfa, "dfa", filename)
+    assert len(fake_render) == 1
+    assert "is up to date, skipping" in capsys.readouterr().out
+
+    visualize_automaton(dfa, "dfa", filename, force=True)
+    assert len(fake_render) == 2
+
+def test_keeps_a_stamp_per_output_format(tmp_path, fake_render, capsys):
+    def single_state(final):
+        return DFA(alphabet=("0",), states=("a",), initial="a",
+                   transitions={("a", "0"): "a"}, final=final)
+    first, second = single_state(()), single_state(("a",))
+    filename = str(tmp_path / "viz")
+    visualize_automaton(first, "dfa", filename)
+    visualize_automaton(second, "dfa", filename, output_format="svg")
+    visualize_automaton(second, "dfa", filename)
+
+    # The PNG was made from the first automaton and has to be redrawn
+    assert len(fake_render) == 3
+    assert fake_render[2] == fake_render[1] != fake_render[0]
+    assert "up to date" not in capsys.readouterr().out
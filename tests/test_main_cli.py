@@ -1,101 +1,103 @@
+import importlib.util
+import io
 import subprocess
 import os
+import sys
+from pathlib import Path
 import pytest
 
+from python_fsa import DFA
+from fsa_json import deserialize_automaton, dump, loads
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def load_script(name):
+    # The CLI scripts aren't importable by name, so load them from their files
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), ROOT / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+main2 = load_script("main2-0")
+
 # Define a temporary directory for test outputs
 @pytest.fixture
 def temp_output_dir(tmp_path):
     return tmp_path
 
-def test_dfa_creation_and_visualization(temp_output_dir):
-    output_filename = temp_output_dir / "test_dfa_viz"
-    command = [
-        "python",
-        "main2-0.py",
-        "--type", "dfa",
-        "--alphabet", "0,1",
-        "--states", "q0,q1",
-        "--initial", "q0",
-        "--final", "q1",
-        "--transitions", "q0,0,q0", "q0,1,q1", "q1,0,q1", "q1,1,q0",
-        "--output-file", str(output_filename)
-    ]
-    
-    # Run the command
-    result = subprocess.run(command, capture_output=True, text=True, cwd=os.getcwd())
-
-    # Assert that the command ran successfully
-    assert result.returncode == 0, f"CLI command failed with error: {result.stderr}"
-    assert "DFA created successfully!" in result.stdout
-    assert f"Visualization saved to {output_filename}.png" in result.stdout
-
-    # Assert that the output file was created
-    assert os.path.exists(f"{output_filename}.png")
+@pytest.fixture
+def run_main(monkeypatch, capsys):
+    """Runs a script's main() in-process, returning its exit code, stdout and stderr"""
+    def run(main, argv, stdin=""):
+        monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+        try:
+            main(argv)
+            code = 0
+        except SystemExit as e:
+            code = e.code
+        captured = capsys.readouterr()
+        return code, captured.out, captured.err
+    return run
 
-def test_nfa_creation_and_visualization(temp_output_dir):
-    output_filename = temp_output_dir / "test_nfa_viz"
-    command = [
-        "python",
-        "main2-0.py",
-        "--type", "nfa",
-        "--alphabet", "a,b",
-        "--states", "s0,s1,s2",
-        "--initial", "s0",
-        "--final", "s2",
-        "--transitions", "s0,a,s1", "s1,b,s2", "s0,a,s0",
+@pytest.mark.parametrize("kind,alphabet,states,initial,final,transitions", [
+    ("dfa", "0,1", "q0,q1", "q0", "q1", ["q0,0,q0", "q0,1,q1", "q1,0,q1", "q1,1,q0"]),
+    ("nfa", "a,b", "s0,s1,s2", "s0", "s2", ["s0,a,s1", "s1,b,s2", "s0,a,s0"]),
+])
+def test_creation_and_visualization(temp_output_dir, run_main, fake_render, kind, alphabet, states, initial, final, transitions):
+    output_filename = temp_output_dir / f"test_{kind}_viz"
+    png_path = output_filename.with_suffix(".png")
+    argv = [
+        "--type", kind,
+        "--alphabet", alphabet,
+        "--states", states,
+        "--initial", initial,
+        "--final", final,
+        "--transitions", *transitions,
         "--output-file", str(output_filename)
     ]
     
     # Run the command
-    result = subprocess.run(command, capture_output=True, text=True, cwd=os.getcwd())
+    code, out, err = run_main(main2.main, argv)
 
     # Assert that the command ran successfully
-    assert result.returncode == 0, f"CLI command failed with error: {result.stderr}"
-    assert "NFA created successfully!" in result.stdout
-    assert f"Visualization saved to {output_filename}.png" in result.stdout
+    assert code == 0, f"CLI command failed with error: {err}"
+    assert f"{kind.upper()} created successfully!" in out
+    assert f"Visualization saved to {png_path}" in out
 
     # Assert that the output file was created
-    assert os.path.exists(f"{output_filename}.png")
+    assert png_path.is_file()
 
-def test_save_and_load_automaton(temp_output_dir):
+def test_save_and_load_automaton(temp_output_dir, run_main):
     json_file = temp_output_dir / "test_automaton.json"
     output_filename = temp_output_dir / "loaded_dfa_viz"
+    png_path = output_filename.with_suffix(".png")
 
-    # 1. Create a DFA and save it
-    create_command = [
-        "python",
-        "main2-0.py",
-        "--type", "dfa",
-        "--alphabet", "0,1",
-        "--states", "q0,q1",
-        "--initial", "q0",
-        "--final", "q1",
-        "--transitions", "q0,0,q0", "q0,1,q1", "q1,0,q1", "q1,1,q0",
-        "--save-to", str(json_file),
-        "--skip-visualization" # Skip visualization during creation
-    ]
-    result_create = subprocess.run(create_command, capture_output=True, text=True, cwd=os.getcwd())
-    assert result_create.returncode == 0, f"Create command failed: {result_create.stderr}"
-    assert os.path.exists(json_file)
-    assert "Automaton saved to" in result_create.stdout
+    # 1. Build a DFA and save it directly, only loading goes through the CLI
+    dfa = DFA(
+        alphabet=("0", "1"),
+        states=("q0", "q1"),
+        initial="q0",
+        final=("q1",),
+        transitions={("q0", "0"): "q0", ("q0", "1"): "q1", ("q1", "0"): "q1", ("q1", "1"): "q0"},
+    )
+    with open(json_file, "wb") as f:
+        dump(dfa, f)
+    with open(json_file, "rb") as f:
+        assert deserialize_automaton(loads(f.read())).transitions == dfa.transitions
 
     # 2. Load the saved automaton and visualize it
-    load_command = [
-        "python",
-        "main2-0.py",
+    load_argv = [
         "--load-from", str(json_file),
         "--output-file", str(output_filename)
     ]
-    result_load = subprocess.run(load_command, capture_output=True, text=True, cwd=os.getcwd())
-    assert result_load.returncode == 0, f"Load command failed: {result_load.stderr}"
-    assert "Automaton loaded successfully" in result_load.stdout
-    assert f"Visualization saved to {output_filename}.png" in result_load.stdout
-    assert os.path.exists(f"{output_filename}.png")
+    code, out, err = run_main(main2.main, load_argv)
+    assert code == 0, f"Load command failed: {err}"
+    assert "Automaton loaded successfully" in out
+    assert f"Visualization saved to {png_path}" in out
+    assert png_path.is_file()
 
-def test_invalid_input_error_handling():
-    command = [
-        "python",
-        "main2-0.py",
+def test_invalid_input_error_handling(run_main):
+    argv = [
         "--type", "dfa",
         "--alphabet", "0,1",
         "--states", "q0,q1",
@@ -103,7 +105,21 @@ def test_invalid_input_error_handling():
         "--final", "q1",
         "--transitions", "q0,0,q2" # q2 is not a defined state
     ]
-    result = subprocess.run(command, capture_output=True, text=True, cwd=os.getcwd())
-    assert result.returncode != 0 # Expect a non-zero exit code for error
-    assert "Error: Transition 'q0,0,q2': Next state 'q2' is not defined in states: ('q0', 'q1')" in result.stderr
+    code, out, err = run_main(main2.main, argv)
+    assert code != 0 # Expect a non-zero exit code for error
+    assert "Error: Transition 'q0,0,q2': Next state 'q2' is not defined in states: ('q0', 'q1')" in err
 
+
+def test_load_from_dot_file():
+    command = [
+        sys.executable,
+        ROOT / "main3-0.py",
+        "--dot-file", os.path.join("assets", "dot_files", "nfa_example.gv"),
+        "--skip-visualization"
+    ]
+    # Accepted iff the second to last symbol is a 1
+    result = subprocess.run(command, input=b"11\n1\n0110\n01\nexit\n", capture_output=True, close_fds=False, cwd=ROOT)
+    assert result.returncode == 0, f"CLI command failed with error: {result.stderr.decode(errors='replace')}"
+    assert b"Automaton loaded successfully" in result.stdout
+    assert result.stdout.count(b"-> Accepted") == 2
+    assert result.stdout.count(b"-> Rejected") == 2